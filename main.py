@@ -8,6 +8,8 @@ st.set_page_config(
     layout="wide"
 )
 
+from utils.embedding import warmup
+
 def main():
     st.title("Welcome to the application 💬")
     st.write("""
@@ -23,3 +25,5 @@ def main():
 
 if __name__ == "__main__":
     main()
+    # Load the embedding model after the page is drawn, before the first PDF upload needs it
+    warmup()
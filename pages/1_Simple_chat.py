@@ -10,13 +10,11 @@ from groq import Groq
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+from utils.streaming import stream_response
 
 # Load environment variables
 load_dotenv()
 
-# Set chat type for this page
-CHAT_TYPE = "simple_chat"
-
 # Initialize Groq client as cached resource
 @st.cache_resource
 def get_groq_client():
@@ -43,20 +41,19 @@ def generate_response(prompt, client, model_name):
             stream=True,
         )
 
-        full_response = ""
-        response_placeholder = st.empty()
-
-        for chunk in response:
-            if chunk.choices and chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-                response_placeholder.markdown(full_response + "▌")
-
-        response_placeholder.markdown(full_response)
-        return full_response
+        return stream_response(response)
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
 
+def get_session_messages():
+    """
+    Returns the message list of the selected session. This is the only copy
+    of the messages, so appending to it keeps the history in sync.
+    """
+    return st.session_state.history[st.session_state.selected_session_index]["messages"]
+
+
 def main():
     """
     Streamlit app for a simple chat interface with LLM.
@@ -66,13 +63,6 @@ def main():
     MODEL_NAME = get_model_name()
     PRODUCTION = get_production_setting()
 
-    # Ensure separate message storage for this page
-    if f"{CHAT_TYPE}_messages" not in st.session_state:
-        st.session_state[f"{CHAT_TYPE}_messages"] = []
-
-    # Get messages specific to this page
-    st.session_state.messages = st.session_state[f"{CHAT_TYPE}_messages"]
-
     # Check if we are in production mode
     is_production = PRODUCTION == "True"
 
@@ -97,6 +87,9 @@ def main():
         st.session_state.history.append(new_session)
         st.session_state.selected_session_index = 0
 
+    # Messages of the selected session; appends update the history in place
+    st.session_state.messages = get_session_messages()
+
     # Sidebar for session history
     with st.sidebar:
         st.header("Session History")
@@ -116,13 +109,10 @@ def main():
         new_session_index = int(selected_session.split(".")[0]) - 1
         if new_session_index != st.session_state.selected_session_index:
             st.session_state.selected_session_index = new_session_index
-            st.session_state.messages = st.session_state.history[new_session_index]["messages"]
-            st.session_state[f"{CHAT_TYPE}_messages"] = st.session_state.messages
             st.rerun()
 
         # Start a new session
         if st.button("Start a new session"):
-            st.session_state.messages = []
             new_session = {
                 "messages": [],
                 "name": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -130,14 +120,11 @@ def main():
             }
             st.session_state.history.append(new_session)
             st.session_state.selected_session_index = len(st.session_state.history) - 1
-            st.session_state[f"{CHAT_TYPE}_messages"] = []
             st.rerun()
 
         # Clear session history
         if st.button("Clear history"):
             st.session_state.history = []
-            st.session_state.messages = []
-            st.session_state[f"{CHAT_TYPE}_messages"] = []
             st.session_state.selected_session_index = None
             st.success("Chat history has been cleared!")
             st.rerun()
@@ -154,7 +141,6 @@ def main():
     if prompt := st.chat_input("Type your message here..."):
         # Store user message
         st.session_state.messages.append({"role": "user", "content": prompt})
-        st.session_state[f"{CHAT_TYPE}_messages"] = st.session_state.messages
 
         with st.chat_message("user"):
             st.markdown(prompt)
@@ -166,12 +152,6 @@ def main():
 
         # Store the assistant's response
         st.session_state.messages.append({"role": "assistant", "content": response})
-        st.session_state[f"{CHAT_TYPE}_messages"] = st.session_state.messages
-
-        # Save messages to the correct session
-        if st.session_state.selected_session_index is not None:
-            st.session_state.history[st.session_state.selected_session_index][
-                "messages"] = st.session_state.messages.copy()
 
 
 if __name__ == "__main__":
@@ -9,11 +9,14 @@ st.set_page_config(
 from groq import Groq
 import os
 import sqlite3
+import numpy as np
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 from utils.chromadb_utils import create_or_get_collection, add_documents_to_collection, query_collection, \
-    sanitize_collection_name
+    sanitize_collection_name, get_collection_count
+from utils.embedding import load_embedding_model
 from utils.pdf_processing import extract_pdf_text, split_text_into_chunks
+from utils.streaming import stream_response
+from utils.vector_search import normalize_rows, top_k_indices
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +24,9 @@ load_dotenv()
 # Set chat type for this page
 CHAT_TYPE = "pdf_chat"
 
+# Up to this many chunks, search a NumPy matrix in memory instead of ChromaDB
+MAX_IN_MEMORY_CHUNKS = 5000
+
 
 # Initialize Groq client - delayed until after set_page_config
 @st.cache_resource
@@ -28,12 +34,6 @@ def get_groq_client():
     return Groq(api_key=st.secrets['GROQ_API_KEY'])
 
 
-# Initialize embedding model (local, gratuit)
-@st.cache_resource
-def load_embedding_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
-
-
 def get_model_name():
     return st.secrets.get('MODEL_NAME', 'llama-3.3-70b-versatile')
 
@@ -42,12 +42,54 @@ def get_production_setting():
     return st.secrets.get('PRODUCTION', 'False')
 
 
+def embed_texts(texts):
+    """
+    Generates embeddings for a list of texts in a single batched encode call.
+    SentenceTransformer.encode already sorts inputs by length before batching
+    (smart batching) and restores the original order, so no manual sort here.
+    Duplicate texts (repeated headers, footers) are encoded only once.
+    """
+    unique_index = {}
+    order = [unique_index.setdefault(text, len(unique_index)) for text in texts]
+
+    embedding_model = load_embedding_model()
+    unique_embeddings = embedding_model.encode(
+        list(unique_index),
+        batch_size=64,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return unique_embeddings[order]
+
+
 def embed_text(text):
     """
     Generates an embedding using local Sentence Transformers (GRATUIT).
     """
-    embedding_model = load_embedding_model()
-    return embedding_model.encode(text).tolist()
+    return embed_texts([text])[0].tolist()
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def embed_query(text):
+    """
+    Cached query embedding, so repeated questions and reruns skip the model.
+    """
+    return embed_text(text)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_index(pdf_bytes):
+    """
+    Extracts, chunks and embeds a PDF. Cached on the file bytes, so
+    re-uploading the same document skips the whole pipeline.
+    Embeddings are cached as float16 to halve the cache's memory footprint.
+    """
+    pdf_text = extract_pdf_text(pdf_bytes)
+    chunks = split_text_into_chunks(pdf_text)
+    embeddings = embed_texts(chunks) if chunks else np.empty((0, 0))
+    embeddings = embeddings.astype(np.float16)
+    return pdf_text, chunks, embeddings
 
 
 def main():
@@ -81,6 +123,8 @@ def main():
         st.session_state.collection_name = None
     if "previous_file" not in st.session_state:
         st.session_state.previous_file = None
+    if "pdf_index" not in st.session_state:
+        st.session_state.pdf_index = None
 
     # Sidebar for clearing history
     with st.sidebar:
@@ -97,25 +141,35 @@ def main():
         if uploaded_file.name != st.session_state.previous_file:
             st.session_state.messages = []
             st.session_state.collection_name = None
+            st.session_state.pdf_index = None
             st.session_state.previous_file = uploaded_file.name
 
             with st.spinner("Processing the PDF..."):
-                pdf_text = extract_pdf_text(uploaded_file)
+                pdf_text, chunks, embeddings = build_index(uploaded_file.getvalue())
 
                 if st.checkbox("Show extracted text from PDF"):
                     st.text_area("Extracted Text", pdf_text, height=300)
 
-                # Create or retrieve collection
-                collection_name = sanitize_collection_name(f"pdf_{uploaded_file.name}")
-                st.session_state.collection_name = collection_name
-                collection = create_or_get_collection(collection_name)
-
-                # Process PDF text and store embeddings
-                if not collection.get()["documents"]:
-                    chunks = split_text_into_chunks(pdf_text)
-                    embeddings = [embed_text(chunk) for chunk in chunks]
-                    add_documents_to_collection(collection, chunks, embeddings)
+                if len(chunks) <= MAX_IN_MEMORY_CHUNKS:
+                    # Small document: brute-force cosine search beats HNSW setup and inserts
+                    st.session_state.pdf_index = {"embs": normalize_rows(embeddings), "docs": chunks}
                     st.success("The PDF text has been indexed!")
+                else:
+                    # Create or retrieve collection
+                    collection_name = sanitize_collection_name(f"pdf_{uploaded_file.name}")
+                    st.session_state.collection_name = collection_name
+                    collection = create_or_get_collection(collection_name)
+
+                    # Process PDF text and store embeddings
+                    if get_collection_count(collection) == 0:
+                        # Chroma only accepts float32, so widen just for the insert
+                        added_count = add_documents_to_collection(
+                            collection, chunks, embeddings.astype(np.float32).tolist()
+                        )
+                        if added_count == len(chunks):
+                            st.success("The PDF text has been indexed!")
+                        else:
+                            st.error(f"Only {added_count} of {len(chunks)} chunks of the PDF were indexed.")
 
     # Display chat history
     for message in st.session_state.messages:
@@ -130,10 +184,15 @@ def main():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        if st.session_state.collection_name:
-            collection = create_or_get_collection(st.session_state.collection_name)
-            query_embedding = embed_text(prompt)
-            relevant_chunks = query_collection(collection, query_embedding)
+        if st.session_state.pdf_index or st.session_state.collection_name:
+            query_embedding = embed_query(prompt)
+            if st.session_state.pdf_index:
+                pdf_index = st.session_state.pdf_index
+                top = top_k_indices(pdf_index["embs"], query_embedding)
+                relevant_chunks = [pdf_index["docs"][i] for i in top]
+            else:
+                collection = create_or_get_collection(st.session_state.collection_name)
+                relevant_chunks = query_collection(collection, query_embedding)
 
             if relevant_chunks:
                 context = "\n\n".join(relevant_chunks)
@@ -151,15 +210,7 @@ def main():
                             stream=True,
                         )
 
-                        message_placeholder = st.empty()
-                        full_response = ""
-
-                        for chunk in response:
-                            if chunk.choices and chunk.choices[0].delta.content:
-                                full_response += chunk.choices[0].delta.content
-                                message_placeholder.markdown(full_response + "▌")
-
-                        message_placeholder.markdown(full_response)
+                        full_response = stream_response(response)
                         st.session_state.messages.append({"role": "assistant", "content": full_response})
                         st.session_state[f"{CHAT_TYPE}_messages"] = st.session_state.messages
             else:
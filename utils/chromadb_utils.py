@@ -1,6 +1,7 @@
 import re
 import chromadb
 from chromadb.config import Settings
+from chromadb.errors import DuplicateIDError
 import streamlit as st
 
 
@@ -22,6 +23,11 @@ def get_chroma_client():
 
 chroma_client = get_chroma_client()
 
+_RE_INVALID = re.compile(r"[^a-zA-Z0-9_-]")
+_RE_LEAD = re.compile(r"^[^a-zA-Z0-9]+")
+_RE_TAIL = re.compile(r"[^a-zA-Z0-9]+$")
+_RE_VALID = re.compile(r"[a-zA-Z0-9][a-zA-Z0-9_-]{1,61}[a-zA-Z0-9]")
+
 
 def sanitize_collection_name(name):
     """
@@ -30,14 +36,18 @@ def sanitize_collection_name(name):
     - Maximum 63 characters
     - Must start and end with alphanumeric
     """
+    # Fast path: name already meets all requirements
+    if name.isascii() and (name.isalnum() and 3 <= len(name) <= 63 or _RE_VALID.fullmatch(name)):
+        return name.lower()
+
     # Replace invalid characters with underscore
-    sanitized_name = re.sub(r"[^a-zA-Z0-9_-]", "_", name)
+    sanitized_name = _RE_INVALID.sub("_", name)
 
     # Ensure it starts with alphanumeric
-    sanitized_name = re.sub(r"^[^a-zA-Z0-9]+", "", sanitized_name)
+    sanitized_name = _RE_LEAD.sub("", sanitized_name)
 
     # Ensure it ends with alphanumeric
-    sanitized_name = re.sub(r"[^a-zA-Z0-9]+$", "", sanitized_name)
+    sanitized_name = _RE_TAIL.sub("", sanitized_name)
 
     # Ensure minimum length of 3 characters
     if len(sanitized_name) < 3:
@@ -47,7 +57,7 @@ def sanitize_collection_name(name):
     sanitized_name = sanitized_name[:63]
 
     # Make sure it still ends with alphanumeric after truncation
-    sanitized_name = re.sub(r"[^a-zA-Z0-9]+$", "", sanitized_name)
+    sanitized_name = _RE_TAIL.sub("", sanitized_name)
 
     return sanitized_name.lower()
 
@@ -78,24 +88,57 @@ def create_or_get_collection(collection_name):
                 raise
 
 
-def add_documents_to_collection(collection, chunks, embeddings):
+def _add_documents_one_by_one(collection, ids, chunks, metadatas, embeddings):
     """
-    Add documents and embeddings to a collection.
-    Handles duplicates gracefully.
+    Add documents one at a time, skipping ids that already exist.
     """
     added_count = 0
-    for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+    for item in zip(ids, chunks, metadatas, embeddings):
         try:
             collection.add(
-                ids=[f"chunk_{idx}"],
-                documents=[chunk],
-                metadatas=[{"chunk_index": idx}],
-                embeddings=[embedding],
+                ids=[item[0]],
+                documents=[item[1]],
+                metadatas=[item[2]],
+                embeddings=[item[3]],
             )
             added_count += 1
-        except Exception as e:
-            # Chunk already exists or other error - skip silently
+        except (DuplicateIDError, ValueError):
             continue
+    return added_count
+
+
+def add_documents_to_collection(collection, chunks, embeddings):
+    """
+    Add documents and embeddings to a collection in bulk, in slices no larger
+    than ChromaDB's maximum batch size. Handles duplicates gracefully.
+    """
+    batch_size = chroma_client.get_max_batch_size()
+    added_count = 0
+    for start in range(0, len(chunks), batch_size):
+        stop = min(start + batch_size, len(chunks))
+        ids = [f"chunk_{idx}" for idx in range(start, stop)]
+        metadatas = [{"chunk_index": idx} for idx in range(start, stop)]
+        batch_chunks = list(chunks[start:stop])
+        batch_embeddings = list(embeddings[start:stop])
+        try:
+            collection.add(
+                ids=ids,
+                documents=batch_chunks,
+                metadatas=metadatas,
+                embeddings=batch_embeddings,
+            )
+            added_count += len(ids)
+        except (DuplicateIDError, ValueError) as e:
+            if not isinstance(e, DuplicateIDError) and "duplicate" not in str(e).lower():
+                st.warning(f"Error adding documents to collection: {e}")
+                break
+            # Some chunks already exist - add this slice item by item
+            added_count += _add_documents_one_by_one(
+                collection, ids, batch_chunks, metadatas, batch_embeddings
+            )
+        except Exception as e:
+            st.warning(f"Error adding documents to collection: {e}")
+            break
 
     return added_count
 
@@ -0,0 +1,167 @@
+import logging
+import os
+import platform
+import shutil
+import tempfile
+
+import numpy as np
+import streamlit as st
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_CACHE_DIR = os.path.join(tempfile.gettempdir(), "all-MiniLM-L6-v2-onnx-int8")
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+# Same truncation as SentenceTransformer('all-MiniLM-L6-v2').max_seq_length
+ONNX_MAX_SEQ_LENGTH = 256
+
+
+class OnnxSentenceEncoder:
+    """
+    Int8 ONNX Runtime version of a sentence-transformers model.
+    Exposes the same encode() call used by the app: mean pooling over
+    the last hidden state, L2-normalized by default like the Normalize
+    module at the end of the all-MiniLM-L6-v2 pipeline.
+    """
+
+    def __init__(self, model, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def encode(self, sentences, batch_size=64, convert_to_numpy=True,
+               normalize_embeddings=True, show_progress_bar=False):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Sort by length so each batch pads to a similar size, like SentenceTransformer does
+        order = np.argsort([-len(s) for s in sentences], kind="stable")
+        embeddings = np.empty((len(sentences), self.model.config.hidden_size), dtype=np.float32)
+
+        for start in range(0, len(sentences), batch_size):
+            batch_idx = order[start:start + batch_size]
+            features = self.tokenizer(
+                [sentences[i] for i in batch_idx],
+                padding=True,
+                truncation=True,
+                max_length=ONNX_MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            hidden = self.model(**features).last_hidden_state
+            hidden = np.asarray(hidden, dtype=np.float32)
+            mask = features["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            embeddings[batch_idx] = pooled
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+
+def load_onnx_encoder(num_threads=None):
+    """
+    Export MiniLM to ONNX and quantize it to int8 (dynamic quantization).
+    The quantized model is built in a scratch directory and moved into place
+    in one step, so other processes never see a half-written cache.
+    Raises if optimum / onnxruntime are missing or the export / quantization fails.
+    """
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    if not os.path.exists(os.path.join(ONNX_CACHE_DIR, ONNX_QUANTIZED_FILE)):
+        build_dir = tempfile.mkdtemp(prefix="all-MiniLM-L6-v2-onnx-", dir=os.path.dirname(ONNX_CACHE_DIR))
+        try:
+            model = ORTModelForFeatureExtraction.from_pretrained(ONNX_MODEL_ID, export=True)
+            model.save_pretrained(build_dir)
+            AutoTokenizer.from_pretrained(ONNX_MODEL_ID).save_pretrained(build_dir)
+
+            if platform.machine().lower() in ("arm64", "aarch64"):
+                qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+            else:
+                qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(save_dir=build_dir, quantization_config=qconfig)
+
+            try:
+                os.replace(build_dir, ONNX_CACHE_DIR)
+            except OSError:
+                # Another process finished first (or left a stale cache): keep theirs
+                pass
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+        session_options.inter_op_num_threads = 1
+
+    try:
+        model = ORTModelForFeatureExtraction.from_pretrained(
+            ONNX_CACHE_DIR,
+            file_name=ONNX_QUANTIZED_FILE,
+            provider="CPUExecutionProvider",
+            session_options=session_options,
+        )
+        tokenizer = AutoTokenizer.from_pretrained(ONNX_CACHE_DIR)
+    except Exception:
+        # A corrupt cache would fail on every start; remove it so the next load rebuilds it
+        shutil.rmtree(ONNX_CACHE_DIR, ignore_errors=True)
+        raise
+    return OnnxSentenceEncoder(model, tokenizer)
+
+
+def _detect_device():
+    """
+    Pick the fastest available device for the embedding model.
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+# Initialize embedding model (local, gratuit)
+@st.cache_resource
+def load_embedding_model():
+    # Cap CPU threads so encoding doesn't thrash the Streamlit process on small containers
+    num_threads = min(8, os.cpu_count() or 1)
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    device = _detect_device()
+    # On CPU prefer the int8 ONNX Runtime model, fall back to PyTorch if it can't be built
+    if device == "cpu":
+        try:
+            return load_onnx_encoder(num_threads=num_threads)
+        except Exception:
+            logger.warning("Could not load the ONNX embedding model, using PyTorch instead", exc_info=True)
+    return SentenceTransformer('all-MiniLM-L6-v2', device=device)
+
+
+@st.cache_resource(show_spinner="Loading the embedding model...")
+def warmup():
+    """
+    Load the embedding model and run one encode at process start, so the
+    first real upload doesn't pay for weight loading and device transfer.
+    Failures are logged and cached, so the home page never breaks or retries.
+    """
+    try:
+        load_embedding_model().encode(["warmup"])
+        return True
+    except Exception:
+        logger.warning("Embedding model warmup failed", exc_info=True)
+        return False
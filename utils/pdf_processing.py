@@ -1,11 +1,53 @@
-from pypdf import PdfReader
+import fitz
+
+# Preferred break points for chunks, from strongest to weakest
+CHUNK_SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+
+def _page_text(page):
+    # Pages without fonts (scans, images) have no text objects; skip the layout pass
+    if not page.get_fonts():
+        return ""
+    return page.get_text("text")
+
 
 def extract_pdf_text(pdf_file):
-    pdf_reader = PdfReader(pdf_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() or ""
-    return text
-
-def split_text_into_chunks(text, chunk_size=500):
-    return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
+    pdf_bytes = pdf_file.read() if hasattr(pdf_file, "read") else pdf_file
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "\n".join(_page_text(page) for page in doc)
+
+
+def _find_chunk_break(text, lo, hi):
+    # Cut after the strongest separator found in text[lo:hi], or at hi if there is none
+    for separator in CHUNK_SEPARATORS:
+        idx = text.rfind(separator, lo, hi)
+        if idx != -1:
+            return idx + len(separator)
+    return hi
+
+
+def split_text_into_chunks(text, chunk_size=400, chunk_overlap=50):
+    """
+    Split text into chunks of at most chunk_size characters, breaking on
+    paragraph, line, sentence or word boundaries, with chunk_overlap
+    characters shared between consecutive chunks.
+    """
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            end = _find_chunk_break(text, start + chunk_size // 2, end)
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+
+        # Start the overlap on a word boundary
+        overlap_start = max(end - chunk_overlap, start + 1)
+        space = text.find(" ", overlap_start, end)
+        start = space + 1 if space != -1 else end
+    return chunks
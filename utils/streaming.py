@@ -0,0 +1,28 @@
+import time
+
+import streamlit as st
+
+# Minimum seconds between markdown re-renders while streaming
+STREAM_RENDER_INTERVAL = 0.05
+
+
+def stream_response(response):
+    """
+    Render a streamed chat completion into a placeholder and return the full text.
+    The growing buffer is re-rendered at most every STREAM_RENDER_INTERVAL seconds,
+    since re-parsing it on every token is quadratic in the answer length.
+    """
+    full_response = ""
+    placeholder = st.empty()
+    last_render = 0.0
+
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            full_response += chunk.choices[0].delta.content
+            now = time.monotonic()
+            if now - last_render > STREAM_RENDER_INTERVAL:
+                placeholder.markdown(full_response + "▌")
+                last_render = now
+
+    placeholder.markdown(full_response)
+    return full_response
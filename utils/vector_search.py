@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def normalize_rows(embeddings):
+    """
+    Return the embeddings as a float32 matrix with L2-normalized rows,
+    so cosine similarity becomes a plain dot product.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.clip(norms, 1e-12, None)
+
+
+def top_k_indices(embeddings, query_embedding, k=3):
+    """
+    Return the indices of the k rows of a normalized embedding matrix most
+    similar to the query, best match first.
+    """
+    if len(embeddings) == 0 or k <= 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    scores = embeddings @ query
+
+    # argpartition is O(N); only the k winners get sorted
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])].tolist()